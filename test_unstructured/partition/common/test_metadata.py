@@ -46,6 +46,9 @@ class Describe_get_last_modified_date:
 
         assert last_modified_date is None
 
+    def and_it_returns_None_when_the_path_is_a_directory(self, tmp_path: pathlib.Path):
+        assert get_last_modified_date(str(tmp_path)) is None
+
 
 # ================================================================================================
 # ELEMENT HIERARCHY
@@ -164,6 +164,51 @@ def test_apply_lang_metadata_has_no_warning_for_PageBreak(caplog):
     assert "No features in text." not in [rec.message for rec in caplog.records]
 
 
+def test_apply_lang_metadata_per_element_detects_repeated_texts_once(mocker):
+    detect_languages_ = mocker.patch(
+        "unstructured.partition.lang.detect_languages", return_value=["spa"]
+    )
+    elements = [NarrativeText("Estado de la solicitud: aprobada.") for _ in range(3)]
+
+    elements = list(
+        apply_lang_metadata(elements=elements, languages=["auto"], detect_language_per_element=True)
+    )
+
+    assert [e.metadata.languages for e in elements] == [["spa"], ["spa"], ["spa"]]
+    assert len({id(e.metadata.languages) for e in elements}) == 3
+    # -- once for the document as a whole, once for the (repeated) element text --
+    assert detect_languages_.call_count == 2
+
+
+def test_apply_lang_metadata_per_element_detection_cache_is_scoped_to_the_call(mocker):
+    detect_languages_ = mocker.patch(
+        "unstructured.partition.lang.detect_languages", return_value=["spa"]
+    )
+
+    for _ in range(2):
+        list(
+            apply_lang_metadata(
+                elements=[NarrativeText("Estado de la solicitud: aprobada.")],
+                languages=["auto"],
+                detect_language_per_element=True,
+            )
+        )
+
+    # -- document-level plus element-level detection, for each call --
+    assert detect_languages_.call_count == 4
+
+
+def test_apply_lang_metadata_per_element_logs_failed_detection_for_each_element(caplog):
+    elements = [NarrativeText("1234 5678 9012 3456 7890") for _ in range(3)]
+
+    elements = list(
+        apply_lang_metadata(elements=elements, languages=["auto"], detect_language_per_element=True)
+    )
+
+    assert [e.metadata.languages for e in elements] == [None, None, None]
+    assert [rec.message for rec in caplog.records].count("No features in text.") == 4
+
+
 @pytest.mark.parametrize(
     ("lang_in", "expected_lang"),
     [
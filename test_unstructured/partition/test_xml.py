@@ -1,8 +1,17 @@
+# pyright: reportPrivateUsage=false
+
 """Test-suite for `unstructured.partition.xml` module."""
 
 from __future__ import annotations
 
+import io
+import os
+import pathlib
+import threading
+from typing import IO, Any, cast
+
 import pytest
+from lxml import etree
 from pytest_mock import MockerFixture
 
 from test_unstructured.unit_utils import example_doc_path
@@ -10,7 +19,7 @@ from unstructured.chunking.title import chunk_by_title
 from unstructured.documents.elements import NarrativeText, Title
 from unstructured.partition.json import partition_json
 from unstructured.partition.utils.constants import UNSTRUCTURED_INCLUDE_DEBUG_METADATA
-from unstructured.partition.xml import partition_xml
+from unstructured.partition.xml import _compiled_xpath, get_leaf_elements, partition_xml
 from unstructured.staging.base import elements_to_json
 
 
@@ -79,6 +88,42 @@ def test_partition_xml_from_text_with_tags():
     assert "<leader>Joe Biden</leader>" in elements[0].text
 
 
+def test_partition_xml_from_filename_with_tags_and_encoding_translates_newlines(
+    tmp_path: pathlib.Path,
+):
+    file_path = tmp_path / "crlf.xml"
+    file_path.write_bytes(b"<root>\r\n  <leader>Joe Biden</leader>\r\n</root>\r\n")
+
+    elements = partition_xml(str(file_path), xml_keep_tags=True, encoding="utf-8")
+
+    assert elements[0].text == "<root>\n  <leader>Joe Biden</leader>\n</root>\n"
+
+
+def test_partition_xml_from_filename_with_tags_and_encoding_reads_a_fifo(tmp_path: pathlib.Path):
+    fifo_path = tmp_path / "doc.xml"
+    os.mkfifo(fifo_path)
+
+    def write_doc():
+        with open(fifo_path, "wb") as f:
+            f.write(b"<root><leader>Joe Biden</leader></root>")
+
+    writer = threading.Thread(target=write_doc)
+    writer.start()
+    elements = partition_xml(str(fifo_path), xml_keep_tags=True, encoding="utf-8")
+    writer.join()
+
+    assert elements[0].text == "<root><leader>Joe Biden</leader></root>"
+
+
+def test_partition_xml_with_tags_detects_language_of_large_document():
+    text = "<root>" + "<p>This is a sentence written in English.</p>" * 5000 + "</root>"
+
+    elements = partition_xml(text=text, xml_keep_tags=True)
+
+    assert elements[0].text == text
+    assert elements[0].metadata.languages == ["eng"]
+
+
 def test_partition_xml_from_filename_with_tags_raises_encoding_error():
     with pytest.raises(UnicodeDecodeError):
         partition_xml(example_doc_path("factbook-utf-16.xml"), xml_keep_tags=True, encoding="utf-8")
@@ -134,6 +179,133 @@ def test_partition_xml_from_file_exclude_metadata(filename: str):
         assert elements[i].metadata.to_dict() == {}
 
 
+# -- get_leaf_elements() ------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    ("xml_path", "expected_value"),
+    [
+        ("/factbook/country/name", ["United States", "Canada", "France", "Trinidad & Tobado"]),
+        ("//leader", ["Joe Biden", "Justin Trudeau", "Emmanuel Macron", "Keith Rowley"]),
+        ("/factbook/leader", []),
+        ("//country[name='Canada']/leader", ["Justin Trudeau"]),
+    ],
+)
+def test_get_leaf_elements_filters_by_xml_path(xml_path: str, expected_value: list[str]):
+    leaf_elements = get_leaf_elements(filename=example_doc_path("factbook.xml"), xml_path=xml_path)
+
+    assert list(leaf_elements) == expected_value
+
+
+@pytest.mark.parametrize("xml_path", ["/factbook/country/name", "//name"])
+def test_get_leaf_elements_does_not_accumulate_parsed_elements_for_simple_xml_path(
+    xml_path: str, mocker: MockerFixture
+):
+    iterparse = etree.iterparse
+    max_preceding_siblings = 0
+
+    def iterparse_(*args: Any, **kwargs: Any):
+        # -- the parser reads ahead, so measure what is retained *before* each element rather
+        # -- than the total size of the partially-built tree --
+        nonlocal max_preceding_siblings
+        for event, element in iterparse(*args, **kwargs):
+            for node in (element, *element.iterancestors()):
+                preceding_count = sum(1 for _ in node.itersiblings(preceding=True))
+                max_preceding_siblings = max(max_preceding_siblings, preceding_count)
+            yield event, element
+
+    mocker.patch.object(etree, "iterparse", side_effect=iterparse_)
+    countries = "".join(
+        f"<country><name>C{i}</name><leader>L{i}</leader><sport>S{i}</sport></country>"
+        for i in range(1000)
+    )
+    text = f"<factbook>{countries}</factbook>"
+
+    names = list(get_leaf_elements(text=text, xml_path=xml_path))
+
+    assert max_preceding_siblings <= 1
+    assert names == [f"C{i}" for i in range(1000)]
+
+
+def test_get_leaf_elements_applies_non_simple_xml_path_to_the_whole_of_a_large_document(
+    tmp_path: pathlib.Path,
+):
+    # -- well beyond the size of a single lxml read chunk --
+    countries = "".join(
+        f"<country><name>C{i}</name><leader>L{i}</leader></country>" for i in range(10000)
+    )
+    file_path = tmp_path / "large.xml"
+    file_path.write_text(f"<factbook>{countries}</factbook>")
+
+    names = list(get_leaf_elements(filename=str(file_path), xml_path="//country/name"))
+
+    assert names == [f"C{i}" for i in range(10000)]
+
+
+def test_get_leaf_elements_compiles_a_repeated_xml_path_only_once(mocker: MockerFixture):
+    XPath_ = mocker.patch.object(etree, "XPath", wraps=etree.XPath)
+    _compiled_xpath.cache_clear()
+    xml_path = "//country[name='Canada']/leader"
+    file_path = example_doc_path("factbook.xml")
+
+    first = list(get_leaf_elements(filename=file_path, xml_path=xml_path))
+    hits = _compiled_xpath.cache_info().hits
+    second = list(get_leaf_elements(filename=file_path, xml_path=xml_path))
+
+    assert first == second == ["Justin Trudeau"]
+    assert _compiled_xpath.cache_info().hits == hits + 1
+    XPath_.assert_called_once_with(xml_path)
+    _compiled_xpath.cache_clear()
+
+
+def test_get_leaf_elements_emits_nested_descendant_path_matches_in_document_order():
+    text = "<r><item>a<item>b</item></item><x><item>c</item></x><item> </item><item>d</item></r>"
+
+    assert list(get_leaf_elements(text=text, xml_path="//item")) == ["a", "b", "c", "d"]
+
+
+def test_get_leaf_elements_from_text_handles_non_ascii_text_spanning_read_chunks():
+    texts = [f"élément-中文-{i}" for i in range(10000)]
+    text = "<root>" + "".join(f"<item>{t}</item>" for t in texts) + "</root>"
+
+    assert list(get_leaf_elements(text=text)) == texts
+
+
+def test_get_leaf_elements_ignores_comments_processing_instructions_and_blank_text():
+    text = "<r><a><!-- note -->text</a><b>  <c>x</c>  </b><?pi x?><d>t1<!-- x -->t2</d></r>"
+
+    assert list(get_leaf_elements(text=text)) == ["text", "x", "t1t2"]
+
+
+@pytest.mark.parametrize("max_in_memory_bytes", [0, 4 * 1024 * 1024])
+def test_get_leaf_elements_gives_same_result_when_parsed_in_memory_or_incrementally(
+    max_in_memory_bytes: int, mocker: MockerFixture
+):
+    mocker.patch("unstructured.partition.xml._IN_MEMORY_PARSE_MAX_BYTES", max_in_memory_bytes)
+    file_path = example_doc_path("factbook.xml")
+
+    with open(file_path, "rb") as f:
+        from_file = list(get_leaf_elements(file=f))
+    from_filename = list(get_leaf_elements(filename=file_path))
+
+    assert from_file == from_filename
+    assert from_filename[:4] == ["United States", "Washington, DC", "Joe Biden", "Baseball"]
+    assert len(from_filename) == 16
+
+
+def test_get_leaf_elements_from_file_like_object_with_only_a_read_method():
+    class ReadOnlyFile:
+        def __init__(self, data: bytes):
+            self._file = io.BytesIO(data)
+
+        def read(self, size: int = -1) -> bytes:
+            return self._file.read(size)
+
+    file = ReadOnlyFile(b"<r><a>alpha</a><b>beta</b></r>")
+
+    assert list(get_leaf_elements(file=cast(IO[bytes], file))) == ["alpha", "beta"]
+
+
 # -- .metadata.last_modified ---------------------------------------------------------------------
 
 
@@ -235,3 +407,23 @@ def test_partition_xml_respects_detect_language_per_element():
     )
     langs = [element.metadata.languages for element in elements]
     assert langs == [["eng"], ["spa", "eng"], ["eng"], ["eng"], ["spa"]]
+
+
+def test_partition_xml_gives_each_element_its_own_metadata_instance():
+    elements = partition_xml(example_doc_path("factbook.xml"))
+
+    assert len({id(e.metadata) for e in elements}) == len(elements)
+    elements[0].metadata.page_number = 42
+    assert elements[1].metadata.page_number is None
+
+
+def test_partition_xml_classifies_repeated_leaf_text_once(mocker: MockerFixture):
+    element_from_text_ = mocker.patch(
+        "unstructured.partition.xml.element_from_text", side_effect=lambda text: Title(text)
+    )
+
+    elements = partition_xml(text="<r><s>OK</s><s>OK</s><s>FAILED</s><s>OK</s></r>")
+
+    assert elements == [Title("OK"), Title("OK"), Title("FAILED"), Title("OK")]
+    assert len({id(e) for e in elements}) == 4
+    assert [c.args for c in element_from_text_.call_args_list] == [("OK",), ("FAILED",)]
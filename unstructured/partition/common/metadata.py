@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import datetime as dt
 import os
+import stat
 from typing import Optional, Sequence
 
 from unstructured.documents.elements import Element
@@ -17,10 +18,15 @@ def get_last_modified_date(filename: str) -> Optional[str]:
     Otherwise returns date and time in ISO 8601 string format (YYYY-MM-DDTHH:MM:SS) like
     "2024-03-05T17:02:53".
     """
-    if not os.path.isfile(filename):
+    # -- a single `stat()` gives both the file type and mtime --
+    try:
+        file_stat = os.stat(filename)
+    except OSError:
+        return None
+    if not stat.S_ISREG(file_stat.st_mode):
         return None
 
-    modify_date = dt.datetime.fromtimestamp(os.path.getmtime(filename))
+    modify_date = dt.datetime.fromtimestamp(file_stat.st_mtime)
     return modify_date.strftime("%Y-%m-%dT%H:%M:%S%z")
 
 
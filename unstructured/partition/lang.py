@@ -13,6 +13,9 @@ from unstructured.partition.utils.constants import (
     TESSERACT_LANGUAGES_SPLITTER,
 )
 
+# texts longer than this are not memoized when detecting language per element
+_LANG_CACHE_MAX_TEXT_LEN = 1000
+
 # pytesseract.get_languages(config="") only shows user installed language packs,
 # so manually include the list of all currently supported Tesseract languages
 PYTESSERACT_LANG_CODES = [
@@ -486,14 +489,37 @@ def apply_lang_metadata(
             e.metadata.languages = detected_languages
             yield e
     else:
+        # -- scoped to this call so cached detections don't outlive the document --
+        detected_languages_by_text: dict[str, list[str]] = {}
         for e in elements:
             if hasattr(e, "text"):
-                e.metadata.languages = detect_languages(e.text)
+                e.metadata.languages = _detect_element_languages(e.text, detected_languages_by_text)
                 yield e
             else:
                 yield e
 
 
+def _detect_element_languages(text: str, cache: dict[str, list[str]]) -> Optional[list[str]]:
+    """Auto-detected languages of `text`, memoized in `cache` for short texts.
+
+    Documents commonly repeat short element texts verbatim (labels, status values, etc.) and
+    detection is deterministic, so repeats need not be run through `langdetect` again. Longer
+    texts are rarely repeated and are not cached. Failed detections are not cached either so the
+    `langdetect` warning is still logged for each element it applies to.
+    """
+    if len(text) > _LANG_CACHE_MAX_TEXT_LEN:
+        return detect_languages(text)
+
+    languages = cache.get(text)
+    if languages is None:
+        languages = detect_languages(text)
+        if languages is None:
+            return None
+        cache[text] = languages
+    # -- a fresh list for each element so changes to one element's metadata don't affect others --
+    return list(languages)
+
+
 def _clean_ocr_languages_arg(ocr_languages: list[str] | str) -> str:
     """Fix common incorrect definitions for ocr_languages:
     defining it as a list, adding extra quotation marks, adding brackets.
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import copy
-from io import BytesIO
-from typing import IO, Any, Iterator, Optional, cast
+import mmap
+import os
+import re
+import stat
+from functools import lru_cache
+from typing import IO, Any, Callable, Iterable, Iterator, Optional, cast
 
 from lxml import etree
 
@@ -13,7 +17,7 @@ from unstructured.documents.elements import (
     Text,
     process_metadata,
 )
-from unstructured.file_utils.encoding import read_txt_file
+from unstructured.file_utils.encoding import format_encoding_str, read_txt_file
 from unstructured.file_utils.filetype import add_metadata_with_filetype
 from unstructured.file_utils.model import FileType
 from unstructured.partition.common.common import (
@@ -26,6 +30,32 @@ from unstructured.partition.text import element_from_text
 
 DETECTION_ORIGIN: str = "xml"
 
+# -- number of leading characters of an `xml_keep_tags=True` document used to detect its language --
+_LANGUAGE_DETECTION_SAMPLE_LEN: int = 10000
+
+# -- libxml2 options shared by every parse in this module. Entities, DTDs and network access are
+# -- never needed to extract text. Whitespace-only text nodes, comments and processing
+# -- instructions are dropped by the parser so they never reach the Python-level loop; dropping
+# -- comments and PIs also merges text they would otherwise split or hide from `.text`.
+_PARSER_OPTIONS: dict[str, Any] = {
+    "resolve_entities": False,
+    "load_dtd": False,
+    "no_network": True,
+    "huge_tree": False,
+    "collect_ids": False,
+    "remove_blank_text": True,
+    "remove_comments": True,
+    "remove_pis": True,
+}
+
+# -- XML sources smaller than this (in bytes) are parsed in one shot rather than incrementally --
+_IN_MEMORY_PARSE_MAX_BYTES: int = 4 * 1024 * 1024
+
+# -- an absolute child-only path like "/root/item" or a single descendant step like "//item",
+# -- both without predicates, wildcards, namespace prefixes or functions. Matches for these can be
+# -- streamed rather than requiring the whole document to be loaded.
+_SIMPLE_XML_PATH_RE = re.compile(r"^(?:(?:/[A-Za-z_][\w.\-]*)+|//[A-Za-z_][\w.\-]*)$")
+
 
 def get_leaf_elements(
     filename: Optional[str] = None,
@@ -40,38 +70,183 @@ def get_leaf_elements(
     elif file:
         return _get_leaf_elements(file=spooled_to_bytes_io_if_needed(file), xml_path=xml_path)
     else:
-        b = BytesIO(bytes(cast(str, text), encoding="utf-8"))
-        return _get_leaf_elements(b, xml_path=xml_path)
+        return _get_leaf_elements(_Utf8TextReader(cast(str, text)), xml_path=xml_path)
 
 
 def _get_leaf_elements(
-    file: str | IO[bytes],
+    file: str | IO[bytes] | _Utf8TextReader,
     xml_path: Optional[str] = None,
 ) -> Iterator[Optional[str]]:
     """Parse the XML tree in a memory efficient manner if possible."""
-    element_stack: list[etree._Element] = []  # pyright: ignore[reportPrivateUsage]
+    if xml_path is not None and _SIMPLE_XML_PATH_RE.match(xml_path):
+        yield from _iter_simple_path_texts(file, xml_path)
+        return
 
-    element_iterator = etree.iterparse(file, events=("start", "end"), resolve_entities=False)
-    # NOTE(alan) If xml_path is used for filtering, I've yet to find a good way to stream
-    # elements through in a memory efficient way, so we bite the bullet and load it all into
-    # memory.
+    # NOTE(alan) If xml_path is used for filtering and is not a simple element path, I've yet to
+    # find a good way to stream elements through in a memory efficient way, so we bite the bullet
+    # and load it all into memory.
     if xml_path is not None:
-        _, element = next(element_iterator)
-        compiled_path = etree.XPath(xml_path)
-        element_iterator = (("end", el) for el in compiled_path(element))
+        root = etree.parse(file, parser=etree.XMLParser(**_PARSER_OPTIONS)).getroot()
+        compiled_path = _compiled_xpath(xml_path)
+        elements = cast("Iterable[etree._Element]", compiled_path(root))
+    elif _is_small_input(file):
+        # -- a one-shot parse followed by a C-level walk is faster than `iterparse()` when the
+        # -- whole document comfortably fits in memory. The walk emits elements in the same
+        # -- (end-event) order as `iterparse()`.
+        root = etree.parse(file, parser=etree.XMLParser(**_PARSER_OPTIONS)).getroot()
+        elements = (element for _, element in etree.iterwalk(root, events=("end",)))
+    else:
+        # -- only "end" events are needed; an element's text is complete by then --
+        elements = (
+            element for _, element in etree.iterparse(file, events=("end",), **_PARSER_OPTIONS)
+        )
 
-    for event, element in element_iterator:
-        if event == "start":
-            element_stack.append(element)
+    for element in elements:
+        # -- each `.text` access decodes a new `str` from the libxml2 node, so read it only once --
+        text = element.text
+        if text and not text.isspace():
+            yield text
 
-        if event == "end":
-            if element.text is not None and element.text.strip():
-                yield element.text
+        element.clear()
 
-            element.clear()
 
-        while element_stack and element_stack[-1].getparent() is None:
-            element_stack.pop()
+def _is_small_input(file: str | IO[bytes] | _Utf8TextReader) -> bool:
+    """True when `file` is known to be smaller than `_IN_MEMORY_PARSE_MAX_BYTES`.
+
+    Size is only known for a path or a seekable file; other sources, including file-like objects
+    that only provide `.read()`, are assumed to be large.
+    """
+    if isinstance(file, str):
+        return os.path.getsize(file) < _IN_MEMORY_PARSE_MAX_BYTES
+    seekable = getattr(file, "seekable", None)
+    if isinstance(file, _Utf8TextReader) or seekable is None or not seekable():
+        return False
+
+    position = file.tell()
+    size = file.seek(0, os.SEEK_END) - position
+    file.seek(position)
+    return size < _IN_MEMORY_PARSE_MAX_BYTES
+
+
+def _iter_simple_path_texts(
+    file: str | IO[bytes] | _Utf8TextReader, xml_path: str
+) -> Iterator[str]:
+    """Stream text of elements matched by a simple `xml_path` like "/root/item" or "//item".
+
+    Only elements with the leaf tag are dispatched by the parser. Each such element is cleared
+    once any matching text is emitted, and the preceding siblings of it and of each of its
+    ancestors are removed, so peak memory is proportional to document depth rather than document
+    size.
+    """
+    descendant = xml_path.startswith("//")
+    steps = xml_path.lstrip("/").split("/")
+    leaf_tag = steps[-1]
+
+    for _, element in etree.iterparse(file, events=("end",), tag=leaf_tag, **_PARSER_OPTIONS):
+        if descendant:
+            # -- a `//tag` match nested in another `//tag` match is emitted (in document order)
+            # -- when its outermost matching ancestor ends.
+            if any(ancestor.tag == leaf_tag for ancestor in element.iterancestors()):
+                continue
+            matches = list(element.iter(leaf_tag))
+        else:
+            matches = [element] if _has_ancestor_tags(element, steps[:-1]) else []
+
+        for match in matches:
+            text = match.text
+            if text and not text.isspace():
+                yield text
+
+        # -- drop this element and everything already parsed before it at every level; those
+        # -- subtrees are complete so any matches they contain have already been emitted --
+        element.clear()
+        node, parent = element, element.getparent()
+        while parent is not None:
+            while node.getprevious() is not None:
+                del parent[0]
+            node, parent = parent, parent.getparent()
+
+
+def _has_ancestor_tags(
+    element: etree._Element,  # pyright: ignore[reportPrivateUsage]
+    tags: list[str],
+) -> bool:
+    """True when ancestors of `element`, nearest first, are exactly `tags` in reverse order."""
+    ancestor = element.getparent()
+    for tag in reversed(tags):
+        if ancestor is None or ancestor.tag != tag:
+            return False
+        ancestor = ancestor.getparent()
+    return ancestor is None
+
+
+def _read_text_file(filename: str, encoding: Optional[str]) -> str:
+    """Text of the file at `filename`, decoded directly from a memory-map when `encoding` is known.
+
+    Without an `encoding` the whole file must be read for encoding detection anyway.
+    """
+    if not encoding:
+        return read_txt_file(filename=filename)[1]
+
+    with open(filename, "rb") as f:
+        file_stat = os.fstat(f.fileno())
+        if not stat.S_ISREG(file_stat.st_mode):
+            # -- FIFOs, `/dev/fd/N` and the like cannot be memory-mapped (nor necessarily reopened)
+            # -- so read them through the already-open file --
+            text = read_txt_file(file=f, encoding=encoding)[1]
+        elif file_stat.st_size == 0:
+            return ""
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, format_encoding_str(encoding))
+
+    # -- match the universal-newlines translation of a file opened in text mode --
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+@lru_cache(maxsize=128)
+def _compiled_xpath(xml_path: str) -> etree.XPath:
+    """Compiled `xml_path`, cached since the same path is typically reused across many files."""
+    return etree.XPath(xml_path)
+
+
+def _build_element(
+    text: str,
+    metadata: ElementMetadata,
+    classify: Callable[[str], tuple[type[Text], str]],
+) -> Element:
+    """Element of the type appropriate to leaf `text`, with its own copy of `metadata`."""
+    element_cls, element_text = classify(text)
+    # -- a shallow copy is enough here; all fields are scalars or are replaced (not mutated)
+    # -- downstream, so each element still gets its own metadata instance.
+    return element_cls(text=element_text, metadata=copy.copy(metadata))
+
+
+def _classify_leaf_text(text: str) -> tuple[type[Text], str]:
+    """Element type for leaf `text` and the (possibly cleaned) element text to construct it with."""
+    element = cast(Text, element_from_text(text))
+    return type(element), element.text
+
+
+class _Utf8TextReader:
+    """Read-only binary file-like view of `text` that encodes it to UTF-8 as it is read.
+
+    This allows `lxml` to parse XML provided as `str` without first materializing a UTF-8 copy of
+    the entire document; only the chunk currently requested by the parser is encoded.
+    """
+
+    def __init__(self, text: str):
+        self._text = text
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """Return UTF-8 bytes for (up to) the next `size` characters, all remaining when -1."""
+        start = self._pos
+        end = len(self._text) if size < 0 else min(start + size, len(self._text))
+        self._pos = end
+        return self._text[start:end].encode("utf-8")
 
 
 @process_metadata()
@@ -123,8 +298,6 @@ def partition_xml(
     """
     exactly_one(filename=filename, file=file, text=text)
 
-    elements: list[Element] = []
-
     last_modification_date = get_last_modified_date(filename) if filename else None
 
     if include_metadata:
@@ -138,14 +311,19 @@ def partition_xml(
 
     if xml_keep_tags:
         if filename:
-            raw_text = read_txt_file(filename=filename, encoding=encoding)[1]
+            raw_text = _read_text_file(filename, encoding)
         elif file:
             raw_text = read_txt_file(file=spooled_to_bytes_io_if_needed(file), encoding=encoding)[1]
         else:
             assert text is not None
             raw_text = text
 
-        elements = [Text(text=raw_text, metadata=metadata)]
+        elements: list[Element] = [Text(text=raw_text, metadata=metadata)]
+        # -- detect language on a leading sample that shares the element's metadata rather
+        # -- than pre-processing the whole (possibly very large) document. This approximates
+        # -- what `langdetect` reads; it keeps at most 10,000 characters but only after
+        # -- removing URLs and e-mail addresses, so the sample can hold somewhat less text.
+        lang_elements = [Text(text=raw_text[:_LANGUAGE_DETECTION_SAMPLE_LEN], metadata=metadata)]
 
     else:
         leaf_elements = get_leaf_elements(
@@ -154,17 +332,24 @@ def partition_xml(
             text=text,
             xml_path=xml_path,
         )
-        for leaf_element in leaf_elements:
-            if leaf_element:
-                element = element_from_text(leaf_element)
-                element.metadata = copy.deepcopy(metadata)
-                elements.append(element)
-
-    elements = list(
-        apply_lang_metadata(
-            elements=elements,
-            languages=languages,
-            detect_language_per_element=detect_language_per_element,
-        ),
-    )
+        # -- XML commonly repeats leaf text verbatim (status flags, enum values, etc.) so
+        # -- memoize classification. The cache is per-call because classification thresholds
+        # -- can be changed via environment variables between calls.
+        classify = lru_cache(maxsize=2048)(_classify_leaf_text)
+        elements = [
+            _build_element(leaf_element, metadata, classify)
+            for leaf_element in leaf_elements
+            if leaf_element
+        ]
+        lang_elements = elements
+
+    # -- `apply_lang_metadata()` sets `.metadata.languages` on each element in place, so its output
+    # -- only needs to be consumed, not collected into a second list of the same elements.
+    for _ in apply_lang_metadata(
+        elements=lang_elements,
+        languages=languages,
+        detect_language_per_element=detect_language_per_element,
+    ):
+        pass
+
     return elements